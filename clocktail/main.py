@@ -1,113 +1,169 @@
 #!/usr/bin/python3
 from dataclasses import dataclass, field, asdict
+from contextlib import contextmanager
+from collections import deque
+import atexit
+import functools
+import heapq
+import itertools
 import os
-import json
 from datetime import datetime, timedelta
 import time
 from pathlib import Path
-from weakref import ref
 import subprocess
+import sys
 import tempfile
+import threading
 import re
 
+
+# orjson is optional: it is much faster, but the stdlib json writes the same data.
+def _to_json(obj):
+    if isinstance(obj, datetime):
+        return obj.isoformat(timespec="seconds")
+    return obj.to_dict()
+
+try:
+    import orjson
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        option = orjson.OPT_PASSTHROUGH_DATACLASS | orjson.OPT_OMIT_MICROSECONDS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_to_json, option=option)
+
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj, indent: bool = False) -> bytes:
+        return json.dumps(
+            obj,
+            default=_to_json,
+            ensure_ascii=False,
+            indent=2 if indent else None,
+            separators=(",", ": ") if indent else (",", ":"),
+        ).encode()
+
+    _loads = json.loads
+
 # Projects should be deleted after this
 PROJECT_MAX_DAYS=15
 
-@dataclass
+# The change log is folded into the snapshot once it grows past this
+LOG_MAX_BYTES=4096
+
+# Snooze durations: a number followed by m(inutes), h(ours) or d(ays)
+DURATION_RE = re.compile(r"^([0-9]+)([mhd])$")
+
+# How each task status is shown
+STATUS_LABELS = {"running": "RUNNING", "waiting": "WAITING", "done": "DONE"}
+
+# ANSI codes that clear the terminal and move the cursor to the top left
+CLEAR_SCREEN = "\x1b[2J\x1b[H"
+
+@dataclass(slots=True)
 class Task:
     name: str
     description: str
     status: str
     snooze_until: datetime | None = None
-    _project : ref | None = None
+    id: int | None = None
+    _project : "Project | None" = field(default=None, init=False, repr=False, compare=False)
 
     @property
     def project(self):
-        return self._project()
+        return self._project
 
     def set_project(self, project):
-        self._project = ref(project)
+        self._project = project
+
+    def render(self) -> str:
+        return f"\nTask:\n[{STATUS_LABELS.get(self.status) or self.status.upper()}] {self.name}\n{self.description}\n"
 
     def display(self):
-        print(f"\nTask:")
-        print(f"[{self.status.upper()}] {self.name}")
-        print(self.description)
+        sys.stdout.write(self.render())
+
+    def render_with_project(self) -> str:
+        rule = "=" * 80 + "\n"
+        return rule + self.project.render() + rule + self.render() + rule
 
     def display_with_project(self):
-        print("="*80)
-        self.project.display()
-        print("="*80)
-        self.display()
-        print("="*80)
+        sys.stdout.write(self.render_with_project())
 
-    def wake_up(self):
-        self.status = "running"
-        self.snooze_until = None
-        self.project.save_tasks()
 
+def _task_to_dict(task: Task) -> dict:
+    return {
+        "id": task.id,
+        "name": task.name,
+        "description": task.description,
+        "status": task.status,
+        "snooze_until": task.snooze_until
+    }
 
-@dataclass
+
+@dataclass(slots=True)
 class Project:
     name: str
     creation_time: datetime = field(default_factory=datetime.now)
     description: str = ""
     tasks: list[Task] = field(default_factory=list)
+    id: int | None = None
+    _not_done: int = field(default=0, init=False, repr=False, compare=False)
+
     def to_dict(self):
         return {
+            "id": self.id,
             "name": self.name,
             "description": self.description,
-            "creation_time": self.creation_time.isoformat(),
-            "tasks": [
-                {
-                "name": task.name,
-                "description": task.description,
-                "status": task.status,
-                "snooze_until": task.snooze_until.isoformat() if task.snooze_until else None
-                }
-                for task in self.tasks
-            ]
+            "creation_time": self.creation_time,
+            "tasks": [_task_to_dict(task) for task in self.tasks]
         }
 
     def add_task(self, task: Task):
         task.set_project(self)
         self.tasks.append(task)
+        if task.status != "done":
+            self._not_done += 1
 
-    def display(self):
-        print(f"\nProject: {self.name}")
+    def set_task_status(self, task: Task, status: str):
+        self._not_done += (status != "done") - (task.status != "done")
+        task.status = status
+
+    def render(self) -> str:
+        lines = [f"\nProject: {self.name}"]
         if self.description:
-            print(self.description)
-        for t in self.tasks:
-            print(f"  [{t.status.upper()}] {t.name}")
+            lines.append(self.description)
+        lines.extend(f"  [{STATUS_LABELS.get(t.status) or t.status.upper()}] {t.name}" for t in self.tasks)
+        return "\n".join(lines) + "\n"
+
+    def display(self):
+        sys.stdout.write(self.render())
 
     def is_done(self) -> bool:
-        for t in self.tasks:
-            if t.status != "done":
-                return False
-        return True
+        return self._not_done == 0
 
-    def can_be_deleted(self) -> bool:
+    def can_be_deleted(self, now: datetime | None = None) -> bool:
         return (
                 self.is_done() and
-                (datetime.now() - self.creation_time) > timedelta(days=PROJECT_MAX_DAYS)
+                ((now or datetime.now()) - self.creation_time) > timedelta(days=PROJECT_MAX_DAYS)
         )
 
+@functools.cache
+def _editor_buffer() -> Path:
+    # Created once per process; mkstemp makes it private (0600) and unique
+    fd, path = tempfile.mkstemp(suffix=".tmp")
+    os.close(fd)
+    buffer = Path(path)
+    atexit.register(buffer.unlink, missing_ok=True)
+    return buffer
+
 def prompt_with_editor(text: str):
     editor = os.getenv("EDITOR", "vim")
-
-    with tempfile.NamedTemporaryFile(suffix=".tmp", mode="r+", delete=False) as tmp_file:
-        temp_filename = tmp_file.name
-
-    with open(temp_filename, "w") as _f:
-        _f.write(text)
-
-    try:
-        subprocess.run([editor, temp_filename])
-        with open(temp_filename, "r") as _f:
-            content = _f.read()
-    finally:
-        os.unlink(temp_filename)
-
-    return content
+    buffer = _editor_buffer()
+    buffer.write_text(text)
+    subprocess.run([editor, buffer])
+    return buffer.read_text()
 
 def prompt_duration() -> timedelta|None:
     def _invalid(i:str):
@@ -115,7 +171,7 @@ def prompt_duration() -> timedelta|None:
         time.sleep(2)
 
     str_input = input("Duration to snooze (suffix with m/h/d): ")
-    mmatch = re.match("([0-9]+)([mhd])", str_input)
+    mmatch = DURATION_RE.match(str_input)
     if mmatch:
         number, letter = mmatch.groups()
         number = int(number)
@@ -131,115 +187,366 @@ def prompt_duration() -> timedelta|None:
 
 
 class TaskManager:
-    def __init__(self, backend_path: Path):
+    def __init__(self, backend_path: Path, save_delay: float = 0, eager_load: bool = True):
+        # backend_path holds a snapshot of all the projects, log_path the
+        # changes made since that snapshot, one json object per line.
         self.backend_path = backend_path
+        self.log_path = backend_path.with_suffix(".log.jsonl")
         self.projects = []
-        self.next_task_generator = self.gen_next_task()
-        self.load_tasks()
+        self._pending: list[bytes] = []
+        self._log_file = None
+        self._ids = itertools.count(1)
+        self._last_saved_hash = None
+        self._projects_by_id: dict[int, Project] = {}
+        self._tasks_by_id: dict[int, Task] = {}
+        self._batch_depth = 0
+        self._dirty = False
+        # With a delay, saves are coalesced and written by a timer thread.
+        self.save_delay = save_delay
+        self._save_timer = None
+        self._save_lock = threading.Lock()
+        self._compact_due = False
+        if save_delay:
+            atexit.register(self._flush_sync)
+        self._sleep_heap: list[tuple[datetime, int, Task]] = []
+        self._runnable: deque[Task] = deque()
+        self._sleep_counter = itertools.count()
+        # Skipping the load is only safe when the caller knows the store is
+        # empty; otherwise new ids would clash with the ones on disk.
+        if eager_load:
+            self.load_tasks()
 
     @property
     def running_projects(self):
         return [p for p in self.projects if not p.is_done()]
 
     def load_tasks(self) -> None:
-        if os.path.exists(self.backend_path):
-            with open(self.backend_path, "r") as _f:
-                self.projects = []
-                for d_project in json.load(_f):
+        self._last_saved_hash = None
+        self.projects = []
+        now = datetime.now()
+        try:
+            d_projects = _loads(self.backend_path.read_bytes())
+        except FileNotFoundError:
+            d_projects = []
+        for d_project in d_projects:
+            project = Project(
+                name=d_project['name'],
+                creation_time=(
+                    datetime.fromisoformat(d_project['creation_time'])
+                    if 'creation_time' in d_project
+                    else now
+                ),
+                description=d_project.get('description', ''),
+                id=d_project.get('id'),
+            )
+            for d_task in d_project['tasks']:
+                task = Task(
+                    name=d_task['name'],
+                    description=d_task['description'],
+                    status=d_task['status'],
+                    snooze_until=(
+                        datetime.fromisoformat(d_task['snooze_until'])
+                        if d_task['snooze_until']
+                        else None
+                    ),
+                    id=d_task.get('id'),
+                )
+                project.add_task(task)
+            self.projects.append(project)
+        # Snapshots written before ids existed get them in file order, which
+        # gives the same ids on every load until the next compaction.
+        self._ids = itertools.count(self._max_id() + 1)
+        for project in self.projects:
+            for item in (project, *project.tasks):
+                if item.id is None:
+                    item.id = next(self._ids)
+        self._reindex()
+        try:
+            log_data = self.log_path.read_bytes()
+        except FileNotFoundError:
+            log_data = b""
+        # _flush only writes whole lines, so anything after the last newline
+        # is a flush cut short by a crash. Drop it, even if it parses, so
+        # later appends start on a clean line.
+        *log_lines, partial = log_data.split(b"\n")
+        if partial:
+            os.truncate(self.log_path, len(log_data) - len(partial))
+        for line in log_lines:
+            if line:
+                self._replay(_loads(line))
+        self._ids = itertools.count(self._max_id() + 1)
+        self.projects = [p for p in self.projects if not p.can_be_deleted(now)]
+        self._reindex()
+        self._sleep_heap = []
+        self._runnable = deque()
+        for project in self.projects:
+            for task in project.tasks:
+                self._schedule(task)
+
+    def _max_id(self) -> int:
+        return max(
+            (item.id for p in self.projects for item in (p, *p.tasks) if item.id is not None),
+            default=0
+        )
+
+    def _reindex(self) -> None:
+        self._projects_by_id = {p.id: p for p in self.projects}
+        self._tasks_by_id = {t.id: t for p in self.projects for t in p.tasks}
+
+    def _find_project(self, project_id: int) -> Project | None:
+        return self._projects_by_id.get(project_id)
+
+    def _find_task(self, task_id: int) -> Task | None:
+        return self._tasks_by_id.get(task_id)
+
+    def _replay(self, event: dict) -> None:
+        # Replaying an event twice is harmless: the log may still hold events
+        # already folded into the snapshot if compact() was interrupted.
+        match event["op"]:
+            case "add_project":
+                if self._find_project(event["id"]) is None:
                     project = Project(
-                        name=d_project['name'],
-                        creation_time=datetime.fromisoformat(
-                            d_project.get('creation_time', datetime.now().isoformat())
-                        ),
-                        description=d_project.get('description', '')
+                        name=event["name"],
+                        creation_time=datetime.fromisoformat(event["creation_time"]),
+                        description=event["description"],
+                        id=event["id"],
                     )
-                    for d_task in d_project['tasks']:
-                        task = Task(
-                            name=d_task['name'],
-                            description=d_task['description'],
-                            status=d_task['status'],
-                            snooze_until=(
-                                datetime.fromisoformat(d_task['snooze_until'])
-                                if d_task['snooze_until']
-                                else None
-                            ),
-                        )
-                        project.add_task(task)
                     self.projects.append(project)
-        else:
-            self.projects = []
+                    self._projects_by_id[project.id] = project
+            case "add_task":
+                project = self._find_project(event["project"])
+                if project is not None and self._find_task(event["id"]) is None:
+                    task = Task(
+                        name=event["name"],
+                        description=event["description"],
+                        status="running",
+                        id=event["id"],
+                    )
+                    project.add_task(task)
+                    self._tasks_by_id[task.id] = task
+            case "status":
+                task = self._find_task(event["id"])
+                if task is not None:
+                    task.project.set_task_status(task, event["status"])
+                    task.snooze_until = (
+                        datetime.fromisoformat(event["snooze_until"])
+                        if event["snooze_until"]
+                        else None
+                    )
+            case "edit_task":
+                task = self._find_task(event["id"])
+                if task is not None:
+                    task.name = event["name"]
+                    task.description = event["description"]
+            case "edit_project":
+                project = self._find_project(event["id"])
+                if project is not None:
+                    project.name = event["name"]
+                    project.description = event["description"]
+
+    def _schedule(self, task: Task):
+        if task.status == "running":
+            self._runnable.append(task)
+        elif task.status == "waiting" and task.snooze_until:
+            heapq.heappush(self._sleep_heap, (task.snooze_until, next(self._sleep_counter), task))
+
+    def _unschedule(self, task: Task):
+        # Entries left in the sleep heap are dropped when they are popped.
+        if task.status == "running":
+            self._runnable = deque(t for t in self._runnable if t is not task)
+
+    @contextmanager
+    def batch(self):
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth and self._dirty:
+                self.save_tasks()
 
     def save_tasks(self) -> None:
-        with open(self.backend_path, "w") as _f:
-            projects_to_keep = [p for p in self.projects if not p.can_be_deleted()]
-            json.dump(projects_to_keep, _f, indent=4, default=lambda x: x.to_dict())
+        if self._batch_depth:
+            self._dirty = True
+            return
+        self._dirty = False
+        if self._compact_due:
+            self.compact()
+            return
+        if not self.save_delay:
+            self._flush()
+            return
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+        # The timer thread only appends to the log: compacting reads every
+        # task, which is only safe on the thread that changes them.
+        self._save_timer = threading.Timer(
+            self.save_delay, self._flush, kwargs={"compact": False}
+        )
+        self._save_timer.daemon = True
+        self._save_timer.start()
+
+    def _flush_sync(self) -> None:
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+            self._flush()
+
+    def _log_status(self, task: Task) -> None:
+        self._log_event("status", id=task.id, status=task.status, snooze_until=task.snooze_until)
+
+    def _log_event(self, op: str, **fields) -> None:
+        with self._save_lock:
+            self._pending.append(_dumps({"op": op, **fields}) + b"\n")
+        self.save_tasks()
+
+    def _flush(self, compact: bool = True) -> None:
+        with self._save_lock:
+            if not self._pending:
+                return
+            log_file = self._open_log()
+            log_file.write(b"".join(self._pending))
+            log_file.flush()
+            os.fsync(log_file.fileno())
+            log_size = log_file.tell()
+            self._pending = []
+            if log_size > LOG_MAX_BYTES:
+                if compact:
+                    self._compact()
+                else:
+                    self._compact_due = True
+
+    def _open_log(self):
+        if self._log_file is None:
+            self._log_file = open(self.log_path, "ab")
+        return self._log_file
+
+    def compact(self) -> None:
+        with self._save_lock:
+            self._compact()
+
+    def close(self) -> None:
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
+        with self._save_lock:
+            try:
+                log_size = self.log_path.stat().st_size
+            except FileNotFoundError:
+                log_size = 0
+            # Nothing to fold in: the snapshot on disk is already current.
+            if self._pending or log_size:
+                self._compact()
+            if self._log_file is not None:
+                self._log_file.close()
+                self._log_file = None
+
+    def _compact(self) -> None:
+        # The snapshot covers every change, pending or logged, so both go.
+        # The snapshot stays indented for people reading the task file;
+        # only compaction writes it, so the extra bytes are rare.
+        payload = _dumps(self.projects, indent=True)
+        payload_hash = hash(payload)
+        if payload_hash != self._last_saved_hash:
+            tmp_path = self.backend_path.with_name(self.backend_path.name + ".tmp")
+            with open(tmp_path, "wb") as _f:
+                _f.write(payload)
+                _f.flush()
+                os.fsync(_f.fileno())
+            os.replace(tmp_path, self.backend_path)
+            self._last_saved_hash = payload_hash
+        self._open_log().truncate(0)
+        self._pending = []
+        self._compact_due = False
 
     def add_task(self, project: Project, name: str, description: str = "") -> Task:
-        task = Task(name, description=description, status="running")
+        task = Task(name, description=description, status="running", id=next(self._ids))
         project.add_task(task)
-        self.save_tasks()
+        self._tasks_by_id[task.id] = task
+        self._schedule(task)
+        self._log_event(
+            "add_task", project=project.id, id=task.id, name=name, description=description
+        )
         return task
 
     def add_project(self, name: str, description:str = "") -> Project:
-        project = Project(name, description=description, creation_time=datetime.now())
+        project = Project(
+            name, description=description, creation_time=datetime.now(), id=next(self._ids)
+        )
         self.projects.append(project)
+        self._projects_by_id[project.id] = project
+        self._log_event(
+            "add_project", id=project.id, name=name, description=description,
+            creation_time=project.creation_time
+        )
         return project
 
-    def list_projects_and_tasks(self) -> str:
-        result = []
+    def iter_projects_and_tasks(self):
         for project in self.projects:
-            result.append(f"Project: {project.name}")
+            yield f"Project: {project.name}\n"
             for task in project.tasks:
                 snooze_info = f" (Snoozed until {task.snooze_until})" if task.snooze_until else ""
-                result.append(f"  [{task.status.upper()}] {task.name}{snooze_info}")
-        return "\n".join(result)
-
-    def get_next_task(self) -> Task:
-        return next(self.next_task_generator)
+                yield f"  [{STATUS_LABELS.get(task.status) or task.status.upper()}] {task.name}{snooze_info}\n"
 
-    def gen_next_task(self):
-        while True:
-            if (
-                    not self.running_projects or
-                    not [p for p in self.running_projects if p.tasks] or
-                    not [t for p in self.running_projects for t in p.tasks if t.status == "running" or self.try_to_wake_up(t)]
-            ):
-                yield None
-            for project in self.running_projects:
-                for task in project.tasks:
-                    if task.status == "waiting" and self.try_to_wake_up(task):
-                        yield task
-                    elif task.status == "running":
-                        yield task
+    def list_projects_and_tasks(self) -> str:
+        return "".join(self.iter_projects_and_tasks())
+
+    def get_next_task(self) -> Task | None:
+        sleep_heap = self._sleep_heap
+        runnable = self._runnable
+        if not runnable and not sleep_heap:
+            return None
+        now = datetime.now()
+        heappop = heapq.heappop
+        with self.batch():
+            while sleep_heap and sleep_heap[0][0] <= now:
+                snooze_until, _, task = heappop(sleep_heap)
+                if task.status == "waiting" and task.snooze_until == snooze_until:
+                    task.snooze_until = None
+                    task.project.set_task_status(task, "running")
+                    runnable.append(task)
+                    self._log_status(task)
+        if not runnable:
+            return None
+        task = runnable.popleft()
+        runnable.append(task)
+        return task
 
     def mark_task(self, task, status):
-        task.status = status
-        self.save_tasks()
+        self._unschedule(task)
+        task.project.set_task_status(task, status)
+        self._schedule(task)
+        self._log_status(task)
         return
 
     def snooze_task(self, task: Task, duration:timedelta):
-        task.status = "waiting"
-        task.snooze_until = datetime.now() + duration
-        self.save_tasks()
+        self._unschedule(task)
+        task.project.set_task_status(task, "waiting")
+        task.snooze_until = (datetime.now() + duration).replace(microsecond=0)
+        self._schedule(task)
+        self._log_status(task)
         return
 
     def edit_task(self, task: Task, name: str, description: str):
+        if (task.name, task.description) == (name, description):
+            return
         task.name = name
         task.description = description
-        self.save_tasks()
+        self._log_event("edit_task", id=task.id, name=name, description=description)
 
-    def try_to_wake_up(self, task) -> bool:
-        if task.snooze_until and datetime.now() >= task.snooze_until:
-            task.snooze_until = None
-            task.status = "running"
-            self.save_tasks()
-            return True
-        return False
+    def wake_task(self, task: Task):
+        self._unschedule(task)
+        task.snooze_until = None
+        task.project.set_task_status(task, "running")
+        self._schedule(task)
+        self._log_status(task)
 
     def edit_project(self, project: Project, name: str, description: str):
+        if (project.name, project.description) == (name, description):
+            return
         project.name = name
         project.description = description
-        self.save_tasks()
+        self._log_event("edit_project", id=project.id, name=name, description=description)
 
     def pick_project(self) -> Project:
         while True:
@@ -247,8 +554,8 @@ class TaskManager:
                 print(f"{idx}. {project.name}")
             project_choice = input(
                 "Select a project by number or press Enter to create a new project: ")
-            if project_choice.isdigit() and 1 <= int(project_choice) <= len(self.projects):
-                project = self.projects[int(project_choice) - 1]
+            if project_choice.isdigit() and 1 <= (idx := int(project_choice)) <= len(self.projects):
+                project = self.projects[idx - 1]
             elif project_choice == "":
                 project = None
             else:
@@ -268,8 +575,8 @@ class TaskManager:
                 print(f"{idx}. {task.name}")
             task_choice = input(
                 "Select a task by number")
-            if task_choice.isdigit() and 1 <= int(task_choice) <= len(tasks_to_pick):
-                task = project.tasks[int(task_choice) - 1]
+            if task_choice.isdigit() and 1 <= (idx := int(task_choice)) <= len(tasks_to_pick):
+                task = tasks_to_pick[idx - 1]
             else:
                 print("Invalid input:")
                 time.sleep(1)
@@ -278,22 +585,27 @@ class TaskManager:
 
 
 def main():
-    manager = TaskManager(Path(__file__).parent.joinpath("taks.json"))
+    manager = TaskManager(Path(__file__).parent.joinpath("taks.json"), save_delay=0.2)
+    if os.name == "nt":
+        # Running any command turns on ANSI code handling in the Windows console
+        os.system("")
     task = manager.get_next_task()
     while True:
-        os.system("clear")
+        screen = [CLEAR_SCREEN]
         if task:
-            task.display_with_project()
-        print("--- Actions ---")
-        print("a - Add Task")
-        print("l - List Projects and Tasks")
+            screen.append(task.render_with_project())
+        screen.append("--- Actions ---\n")
+        screen.append("a - Add Task\n")
+        screen.append("l - List Projects and Tasks\n")
         if task:
-            print("d - Mark Task as done")
-            print("s - Snooze Task")
-            print("e - Edit Task")
-            print("p - Edit Project")
-        print("x - Exit")
-        print("<enter> skips task")
+            screen.append("d - Mark Task as done\n")
+            screen.append("s - Snooze Task\n")
+            screen.append("e - Edit Task\n")
+            screen.append("p - Edit Project\n")
+        screen.append("x - Exit\n")
+        screen.append("<enter> skips task\n")
+        sys.stdout.write("".join(screen))
+        sys.stdout.flush()
         choice = input("Select an option:")
 
         if choice.lower() == "ae" or choice.lower() == "a":
@@ -307,25 +619,28 @@ def main():
                     project = manager.pick_project()
             else:
                 project = task.project if task is not None else None
-            if project is None:
-                project = manager.add_project(
-                    input("New Project Name: "),
-                    prompt_with_editor("Project Description:")
-                )
-            name = input("Task Name:")
-            description = prompt_with_editor("Task Description:")
-            manager.add_task(project, name, description)
+            with manager.batch():
+                if project is None:
+                    project = manager.add_project(
+                        input("New Project Name: "),
+                        prompt_with_editor("Project Description:")
+                    )
+                name = input("Task Name:")
+                description = prompt_with_editor("Task Description:")
+                manager.add_task(project, name, description)
         elif choice.lower() == "l":
-            print(manager.list_projects_and_tasks())
+            sys.stdout.writelines(manager.iter_projects_and_tasks())
             input("Press Enter to continue...")
         elif task and choice.lower() == "d":
-            manager.mark_task(task, "done")
-            task = manager.get_next_task()
+            with manager.batch():
+                manager.mark_task(task, "done")
+                task = manager.get_next_task()
         elif task and choice.lower() == "s":
             duration = prompt_duration()
             if duration:
-                manager.snooze_task(task, duration)
-                task = manager.get_next_task()
+                with manager.batch():
+                    manager.snooze_task(task, duration)
+                    task = manager.get_next_task()
         elif task and choice.lower() == "e":
             print(f"Current Task Name: {task.name}")
             manager.edit_task(
@@ -340,6 +655,7 @@ def main():
                 prompt_with_editor(task.project.description)
             )
         elif choice.lower() == "x":
+            manager.close()
             break
         elif choice.lower() == "w":
             project = manager.pick_project()
@@ -349,7 +665,7 @@ def main():
                 continue
             task = manager.pick_task(project,filter = lambda t:t.status == "waiting")
             if task:
-                task.wake_up()
+                manager.wake_task(task)
         elif choice == "":
             task = manager.get_next_task()
         else:
@@ -2,14 +2,15 @@ import pytest
 from pathlib import Path
 import tempfile
 from datetime import datetime, timedelta
-from clocktail.main import TaskManager, Task  # Assuming the main code is saved as task_manager.py
+from clocktail.main import TaskManager, Task, prompt_duration  # Assuming the main code is saved as task_manager.py
 
 @pytest.fixture
 def manager():
     # Set up a fresh TaskManager for each test
     with tempfile.TemporaryDirectory() as _d:
-        tm = TaskManager(Path(_d).joinpath("tasks.json"))
+        tm = TaskManager(Path(_d).joinpath("tasks.json"), eager_load=False)
         yield tm
+        tm.close()
 
 def test_add_task(manager):
     project = manager.add_project("Project1")
@@ -84,3 +85,192 @@ def test_edit_task(manager):
     assert manager.projects[0].tasks[0].name == "Updated Task 1"
     assert manager.projects[0].tasks[0].description == "123"
 
+
+def test_batch_saves_once(manager):
+    with manager.batch():
+        task = manager.add_task(manager.add_project("Project1"), "Task 1")
+        manager.snooze_task(task, timedelta(minutes=10))
+        assert not manager.backend_path.exists()
+    manager.load_tasks()
+    assert manager.projects[0].tasks[0].status == "waiting"
+
+def test_running_projects_follow_status(manager):
+    task = manager.add_task(manager.add_project("Project1"), "Task 1")
+    assert manager.running_projects == manager.projects
+    manager.mark_task(task, "done")
+    assert manager.running_projects == []
+    manager.mark_task(task, "running")
+    assert manager.running_projects == manager.projects
+
+def test_wake_task(manager):
+    task = manager.add_task(manager.add_project("Project1"), "Task 1")
+    manager.snooze_task(task, timedelta(minutes=10))
+    manager.wake_task(task)
+    manager.load_tasks()
+    task = manager.projects[0].tasks[0]
+    assert task.status == "running"
+    assert task.snooze_until is None
+
+def test_get_next_task_skips_done_and_snoozed(manager):
+    project = manager.add_project("Project 1")
+    task1 = manager.add_task(project, "Task 1")
+    task2 = manager.add_task(project, "Task 2")
+    task3 = manager.add_task(project, "Task 3")
+    manager.mark_task(task1, "done")
+    manager.snooze_task(task2, timedelta(minutes=10))
+    assert manager.get_next_task() is task3
+    assert manager.get_next_task() is task3
+    manager.snooze_task(task2, timedelta(minutes=-10))
+    assert manager.get_next_task() is task3
+    assert manager.get_next_task() is task2
+    assert task2.status == "running"
+
+def test_delayed_save():
+    with tempfile.TemporaryDirectory() as _d:
+        manager = TaskManager(Path(_d).joinpath("tasks.json"), save_delay=60)
+        manager.add_task(manager.add_project("Project1"), "Task 1")
+        assert not manager.backend_path.exists()
+        manager._flush_sync()
+        manager.load_tasks()
+        assert manager.projects[0].tasks[0].name == "Task 1"
+        manager.close()
+
+def test_log_replay_and_compact(manager):
+    project = manager.add_project("Project1")
+    task = manager.add_task(project, "Task 1")
+    manager.edit_project(project, "Project 1", "Desc")
+    manager.snooze_task(task, timedelta(minutes=10))
+    assert not manager.backend_path.exists()
+    manager.load_tasks()
+    assert manager.projects[0].name == "Project 1"
+    assert manager.projects[0].tasks[0].status == "waiting"
+    manager.compact()
+    assert manager.log_path.stat().st_size == 0
+    manager.load_tasks()
+    assert manager.projects[0].description == "Desc"
+    task = manager.add_task(manager.projects[0], "Task 2")
+    manager.load_tasks()
+    assert [t.name for t in manager.projects[0].tasks] == ["Task 1", "Task 2"]
+    assert manager.projects[0].tasks[1].id == task.id
+
+def test_list_projects_and_tasks(manager):
+    assert manager.list_projects_and_tasks() == ""
+    project = manager.add_project("Project1")
+    manager.add_task(project, "Task 1")
+    manager.mark_task(manager.add_task(project, "Task 2"), "done")
+    assert manager.list_projects_and_tasks() == (
+        "Project: Project1\n"
+        "  [RUNNING] Task 1\n"
+        "  [DONE] Task 2\n"
+    )
+
+@pytest.mark.parametrize("text, expected", [
+    ("10m", timedelta(minutes=10)),
+    ("2h", timedelta(hours=2)),
+    ("3d", timedelta(days=3)),
+    ("10mX", None),
+    ("m", None),
+])
+def test_prompt_duration(monkeypatch, text, expected):
+    monkeypatch.setattr("builtins.input", lambda _: text)
+    monkeypatch.setattr("time.sleep", lambda _: None)
+    assert prompt_duration() == expected
+
+def test_pick_task_uses_filtered_list(manager, monkeypatch):
+    project = manager.add_project("Project1")
+    manager.add_task(project, "Task 1")
+    task2 = manager.add_task(project, "Task 2")
+    manager.snooze_task(task2, timedelta(minutes=10))
+    monkeypatch.setattr("builtins.input", lambda _: "1")
+    assert manager.pick_task(project) is task2
+
+def test_unchanged_edit_is_not_logged(manager):
+    task = manager.add_task(manager.add_project("Project1"), "Task 1", "Desc")
+    log_size = manager.log_path.stat().st_size
+    manager.edit_task(task, "Task 1", "Desc")
+    manager.edit_project(task.project, "Project1", "")
+    assert manager.log_path.stat().st_size == log_size
+
+def test_close_compacts(manager):
+    manager.add_task(manager.add_project("Project1"), "Task 1")
+    manager.close()
+    assert manager.log_path.stat().st_size == 0
+    manager.load_tasks()
+    assert manager.projects[0].tasks[0].name == "Task 1"
+
+def test_display_with_project(manager, capsys):
+    project = manager.add_project("Project1", "Project desc")
+    task = manager.add_task(project, "Task 1", "Task desc")
+    manager.add_task(project, "Task 2")
+    task.display_with_project()
+    rule = "=" * 80
+    assert capsys.readouterr().out == (
+        f"{rule}\n"
+        "\nProject: Project1\nProject desc\n  [RUNNING] Task 1\n  [RUNNING] Task 2\n"
+        f"{rule}\n"
+        "\nTask:\n[RUNNING] Task 1\nTask desc\n"
+        f"{rule}\n"
+    )
+
+def test_get_next_task_empty(manager):
+    assert manager.get_next_task() is None
+    manager.add_project("Project1")
+    assert manager.get_next_task() is None
+
+def test_load_ignores_partial_last_log_line(manager):
+    task = manager.add_task(manager.add_project("Project1"), "Task 1")
+    manager.close()
+    manager.add_task(task.project, "Task 2")
+    log_size = manager.log_path.stat().st_size
+    with open(manager.log_path, "ab") as _f:
+        _f.write(b'{"op":"status","id":2,"sta')
+    manager.load_tasks()
+    assert [t.name for t in manager.projects[0].tasks] == ["Task 1", "Task 2"]
+    assert manager.log_path.stat().st_size == log_size
+    manager.mark_task(manager.projects[0].tasks[1], "done")
+    manager.load_tasks()
+    assert manager.projects[0].tasks[1].status == "done"
+
+def test_delayed_flush_defers_compaction(monkeypatch):
+    monkeypatch.setattr("clocktail.main.LOG_MAX_BYTES", 0)
+    with tempfile.TemporaryDirectory() as _d:
+        manager = TaskManager(Path(_d).joinpath("tasks.json"), save_delay=60)
+        project = manager.add_project("Project1")
+        manager._save_timer.cancel()
+        manager._flush(compact=False)
+        assert not manager.backend_path.exists()
+        assert manager.log_path.stat().st_size > 0
+        manager.add_task(project, "Task 1")
+        assert manager.backend_path.exists()
+        assert manager.log_path.stat().st_size == 0
+        manager.load_tasks()
+        assert manager.projects[0].tasks[0].name == "Task 1"
+        manager.close()
+
+def test_running_projects_after_snoozing_done_task(manager):
+    task = manager.add_task(manager.add_project("Project1"), "Task 1")
+    manager.mark_task(task, "done")
+    assert manager.running_projects == []
+    manager.snooze_task(task, timedelta(minutes=10))
+    assert manager.running_projects == manager.projects
+
+def test_close_without_changes_skips_snapshot(manager):
+    manager.add_task(manager.add_project("Project1"), "Task 1")
+    manager.close()
+    mtime = manager.backend_path.stat().st_mtime_ns
+    manager.load_tasks()
+    manager.close()
+    assert manager.backend_path.stat().st_mtime_ns == mtime
+
+def test_load_drops_log_line_missing_its_newline(manager):
+    project = manager.add_project("Project1")
+    task = manager.add_task(project, "Task 1")
+    manager.snooze_task(task, timedelta(minutes=10))
+    log_data = manager.log_path.read_bytes()
+    manager.log_path.write_bytes(log_data[:-1])
+    manager.load_tasks()
+    assert manager.projects[0].tasks[0].status == "running"
+    manager.add_task(manager.projects[0], "Task 2")
+    manager.load_tasks()
+    manager.load_tasks()
+    assert [t.name for t in manager.projects[0].tasks] == ["Task 1", "Task 2"]